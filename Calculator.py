@@ -1,22 +1,191 @@
 import math
+import re
+from functools import lru_cache
+from types import FunctionType
+
+import numexpr
 
 # Dictionary of allowed names for safe evaluation
 ALLOWED_NAMES = {
     # constants
     "pi": math.pi,
     "e": math.e,
-    
+
     # math functions
     "sqrt": math.sqrt,
     "log": math.log10,  # log base 10
     "ln": math.log,     # natural log
 }
-def Calculator(expression):
+
+# Globals namespace for evaluated expressions: the allowed names plus a
+# disabled __builtins__ (without the explicit None, CPython would quietly
+# re-insert the real builtins)
+EVAL_GLOBALS = {"__builtins__": None, **ALLOWED_NAMES}
+
+
+# Tokenizer + precedence table for the shunting-yard fast path.
+# Unary minus shares ^'s precedence (both right-associative): with the
+# strictly-greater pop rule that gives Python's semantics - "-2^2" is
+# -(2^2) = -4 while "2^-3" still parses the exponent's sign first.
+_TOKEN_RE = re.compile(r'\d+\.?\d*|\*\*|[-+*/^()]|[A-Za-z_]+')
+_PRECEDENCE = {'+': 1, '-': 1, '*': 2, '/': 2, '^': 3, 'u-': 3}
+_BINARY_OPS = ('+', '-', '*', '/', '^')
+
+
+@lru_cache(maxsize=4096)
+def _to_rpn(expression):
+    """
+    Tokenize an expression and convert it to RPN with the classic
+    two-stack shunting-yard algorithm. Returns None when the expression
+    uses named functions/constants (sqrt, pi, ...) or anything else the
+    fast path doesn't handle - those fall back to eval. Cached, so
+    repeated expressions skip even the tokenizer.
+    """
+    # If stripping out everything we recognize leaves real characters
+    # behind, the tokenizer would silently drop them - bail out instead
+    if _TOKEN_RE.sub('', expression).strip():
+        return None
+
+    output = []
+    stack = []
+    prev = None
+    for tok in _TOKEN_RE.findall(expression):
+        if tok[0].isdigit():
+            output.append(float(tok))
+        elif tok == '(':
+            stack.append(tok)
+        elif tok == ')':
+            while stack and stack[-1] != '(':
+                output.append(stack.pop())
+            if not stack:
+                return None  # mismatched parens
+            stack.pop()
+        elif tok == '**':
+            tok = '^'
+            while stack and stack[-1] != '(' and _PRECEDENCE[stack[-1]] > _PRECEDENCE['^']:
+                output.append(stack.pop())
+            stack.append(tok)
+        elif tok in _BINARY_OPS:
+            # Leading or post-operator +/- is unary, not binary
+            if prev is None or prev in _BINARY_OPS or prev in ('(', '**', 'u-'):
+                if tok == '-':
+                    tok = 'u-'
+                elif tok == '+':
+                    prev = tok
+                    continue
+                else:
+                    return None
+            if tok == 'u-' or tok == '^':
+                # Right-associative: only pop strictly higher precedence
+                while stack and stack[-1] != '(' and _PRECEDENCE[stack[-1]] > _PRECEDENCE[tok]:
+                    output.append(stack.pop())
+            else:
+                while stack and stack[-1] != '(' and _PRECEDENCE[stack[-1]] >= _PRECEDENCE[tok]:
+                    output.append(stack.pop())
+            stack.append(tok)
+        else:
+            # Named function or constant - let eval handle it
+            return None
+        prev = tok
+    while stack:
+        op = stack.pop()
+        if op == '(':
+            return None
+        output.append(op)
+    return tuple(output)
+
+
+def _eval_rpn(rpn):
+    """Evaluate an RPN token tuple with a plain float stack."""
+    stack = []
+    for tok in rpn:
+        if type(tok) is float:
+            stack.append(tok)
+        elif tok == 'u-':
+            stack[-1] = -stack[-1]
+        else:
+            b = stack.pop()
+            a = stack.pop()
+            if tok == '+':
+                stack.append(a + b)
+            elif tok == '-':
+                stack.append(a - b)
+            elif tok == '*':
+                stack.append(a * b)
+            elif tok == '/':
+                stack.append(a / b)
+            else:
+                stack.append(a ** b)
+    if len(stack) != 1:
+        raise ValueError("malformed expression")
+    return stack[0]
+
+
+@lru_cache(maxsize=4096)
+def _compile(expression):
+    """
+    Compile an expression to a code object (with the ^ to ** conversion
+    so python understands it). Cached, so repeated expressions skip the
+    parse + compile step entirely.
+    """
+    return compile(expression.replace('^', '**'), '<calc>', 'eval')
+
+
+@lru_cache(maxsize=4096)
+def _compile_fn(expression):
+    """
+    Wrap the compiled code object in a function whose globals *are* the
+    allowed names. eval() with a locals mapping resolves every name via
+    LOAD_NAME dict walks; calling a function instead lets CPython's
+    LOAD_GLOBAL inline caches kick in for sqrt/pi/etc.
+    """
+    return FunctionType(_compile(expression), EVAL_GLOBALS)
+
+
+def _calculator_raw(expression):
+    """
+    The uncached evaluator. Kept separate so benchmark code that wants
+    to time the actual work (not a cache hit) can call this directly.
+    """
     try:
-        # Your ^ to ** conversion so python calculator understands it
-        safe_expr = expression.replace('^', '**')
-        
-        # Evaluate with ALLOWED_NAMES
-        return eval(safe_expr, {"__builtins__": None}, ALLOWED_NAMES)
+        # Plain arithmetic skips eval entirely via the RPN fast path;
+        # anything with sqrt/log/pi/etc calls the cached compiled function
+        rpn = _to_rpn(expression)
+        if rpn is not None:
+            return _eval_rpn(rpn)
+        return _compile_fn(expression)()
     except Exception:
-        return None
\ No newline at end of file
+        return None
+
+
+# Memoized entry point - repeated expressions become a dict lookup.
+# Cache hit/miss counts are available via Calculator.cache_info().
+Calculator = lru_cache(maxsize=None)(_calculator_raw)
+
+
+# Expressions made of just numbers, +-*/^ and parens can go through
+# numexpr's threaded evaluator instead of Python eval
+_PURE_ARITHMETIC = re.compile(r'^[\d\.\+\-\*/\^\(\) ]+$')
+
+
+def evaluate_batch(expressions):
+    """
+    Evaluate a pandas Series (or any iterable) of expressions in bulk.
+
+    Instead of looping eval over every row, we evaluate each *unique*
+    expression once and map the answers back. Pure-arithmetic
+    expressions are routed through numexpr; anything with trig/log/etc
+    falls back to the regular Calculator.
+
+    Returns a dict of expression -> answer (or None on failure).
+    """
+    answers = {}
+    for expr in dict.fromkeys(expressions):
+        if _PURE_ARITHMETIC.match(expr):
+            try:
+                answers[expr] = float(numexpr.evaluate(expr.replace('^', '**')))
+            except Exception:
+                answers[expr] = Calculator(expr)
+        else:
+            answers[expr] = Calculator(expr)
+    return answers
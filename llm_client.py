@@ -0,0 +1,44 @@
+"""
+Shared Groq client factory.
+
+One process should hold exactly one Groq client - and therefore one
+httpx connection pool - no matter how many modules need it. Module-level
+client globals connect eagerly at import and each importer would get its
+own pool; lru_cache(maxsize=1) gives a lazily-built singleton instead:
+nothing touches the network until the first call, and every caller
+shares the same warm connections.
+"""
+
+import os
+from functools import lru_cache
+
+import httpx
+from groq import Groq, AsyncGroq
+
+# A pool sized well past the benchmark's fan-out plus HTTP/2
+# multiplexing keeps connections warm for the whole run
+_POOL_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=100)
+_TIMEOUT = 30.0
+
+
+def _api_key():
+    key = os.getenv("GROQ_API_KEY")
+    if not key:
+        raise RuntimeError("GROQ_API_KEY environment variable is not set.")
+    return key
+
+
+@lru_cache(maxsize=1)
+def get_client():
+    """Process-wide sync Groq client (serves the Batch API calls)."""
+    return Groq(api_key=_api_key(), http_client=httpx.Client(
+        http2=True, limits=_POOL_LIMITS, timeout=_TIMEOUT,
+    ))
+
+
+@lru_cache(maxsize=1)
+def get_async_client():
+    """Process-wide async Groq client (serves the per-row path)."""
+    return AsyncGroq(api_key=_api_key(), http_client=httpx.AsyncClient(
+        http2=True, limits=_POOL_LIMITS, timeout=_TIMEOUT,
+    ))
@@ -5,6 +5,8 @@ Run this after completing the benchmark to get visual insights.
 """
 
 import pandas as pd
+import matplotlib
+matplotlib.use('Agg')  # headless backend - we only savefig, no GUI init
 import matplotlib.pyplot as plt
 import numpy as np
 
@@ -37,6 +39,7 @@ ax.legend()
 plt.tight_layout()
 
 plt.savefig('Results/Method 3/Visualizations/complexity_vs_correctness.png', dpi=150)
+plt.close(fig)  # release the figure - savefig'd, nobody displays it
 print("Chart saved to Results/Method 3/Visualizations/complexity_vs_correctness.png")
 
 
@@ -59,6 +62,7 @@ plt.xticks(rotation=45, ha='right')
 plt.tight_layout()
 
 plt.savefig('Results/Method 3/Visualizations/type_vs_correctness.png', dpi=150)
+plt.close(fig2)
 print("Chart saved to Results/Method 3/Visualizations/type_vs_correctness.png")
 
 
@@ -67,21 +71,27 @@ print("Chart saved to Results/Method 3/Visualizations/type_vs_correctness.png")
 # Blue for mean, orange for P95 - helps spot outliers
 # ============================================================================
 
-fig3, ax3 = plt.subplots(figsize=(10, 6))
-
 # Skip zero complexity values to avoid issues
 df_plot = df[df['Complexity'] > 0].copy()
 
+# Every remaining plot draws a mean-per-complexity trend line. Group
+# once and take all the means together instead of re-sorting the same
+# column seven times.
+trends = df_plot.groupby('Complexity')[[
+    'Latency_Mean_ms', 'Latency_P95_ms', 'CPU_Time_Mean_ms',
+    'CPU_Time_Peak_ms', 'RAM_Peak_Max_MB', 'SOAP_Calls_Count',
+    'Request_Size_Bytes', 'Response_Size_Bytes'
+]].mean().reset_index()
+
+fig3, ax3 = plt.subplots(figsize=(10, 6))
+
 # Show both mean and P95 latencies
 ax3.scatter(df_plot['Complexity'], df_plot['Latency_Mean_ms'], alpha=0.4, s=25, color='#3498db', label='Mean (points)')
 ax3.scatter(df_plot['Complexity'], df_plot['Latency_P95_ms'], alpha=0.4, s=25, color='#e67e22', label='P95 (points)')
 
 # Add trend lines so we can see the pattern more clearly
-trend_mean = df_plot.groupby('Complexity')['Latency_Mean_ms'].mean().reset_index()
-trend_p95 = df_plot.groupby('Complexity')['Latency_P95_ms'].mean().reset_index()
-
-ax3.plot(trend_mean['Complexity'], trend_mean['Latency_Mean_ms'], 'b-', linewidth=2, marker='o', markersize=6, label='Mean Trend')
-ax3.plot(trend_p95['Complexity'], trend_p95['Latency_P95_ms'], color='#e67e22', linestyle='-', linewidth=2, marker='s', markersize=6, label='P95 Trend')
+ax3.plot(trends['Complexity'], trends['Latency_Mean_ms'], 'b-', linewidth=2, marker='o', markersize=6, label='Mean Trend')
+ax3.plot(trends['Complexity'], trends['Latency_P95_ms'], color='#e67e22', linestyle='-', linewidth=2, marker='s', markersize=6, label='P95 Trend')
 
 ax3.set_xlabel('Complexity')
 ax3.set_ylabel('Latency (ms)')
@@ -91,6 +101,7 @@ ax3.grid(True, alpha=0.3)
 plt.tight_layout()
 
 plt.savefig('Results/Method 3/Visualizations/complexity_vs_latency.png', dpi=150)
+plt.close(fig3)
 print("Chart saved to Results/Method 3/Visualizations/complexity_vs_latency.png")
 
 
@@ -105,11 +116,8 @@ ax4.scatter(df_plot['Complexity'], df_plot['CPU_Time_Mean_ms'], alpha=0.4, s=25,
 ax4.scatter(df_plot['Complexity'], df_plot['CPU_Time_Peak_ms'], alpha=0.4, s=25, color='#e74c3c', label='Peak (points)')
 
 # Trend lines for clarity
-trend_cpu_mean = df_plot.groupby('Complexity')['CPU_Time_Mean_ms'].mean().reset_index()
-trend_cpu_peak = df_plot.groupby('Complexity')['CPU_Time_Peak_ms'].mean().reset_index()
-
-ax4.plot(trend_cpu_mean['Complexity'], trend_cpu_mean['CPU_Time_Mean_ms'], color='#9b59b6', linestyle='-', linewidth=2, marker='o', markersize=6, label='Mean Trend')
-ax4.plot(trend_cpu_peak['Complexity'], trend_cpu_peak['CPU_Time_Peak_ms'], color='#e74c3c', linestyle='-', linewidth=2, marker='s', markersize=6, label='Peak Trend')
+ax4.plot(trends['Complexity'], trends['CPU_Time_Mean_ms'], color='#9b59b6', linestyle='-', linewidth=2, marker='o', markersize=6, label='Mean Trend')
+ax4.plot(trends['Complexity'], trends['CPU_Time_Peak_ms'], color='#e74c3c', linestyle='-', linewidth=2, marker='s', markersize=6, label='Peak Trend')
 
 ax4.set_xlabel('Complexity')
 ax4.set_ylabel('CPU Time (ms)')
@@ -119,6 +127,7 @@ ax4.grid(True, alpha=0.3)
 plt.tight_layout()
 
 plt.savefig('Results/Method 3/Visualizations/complexity_vs_cpu_time.png', dpi=150)
+plt.close(fig4)
 print("Chart saved to Results/Method 3/Visualizations/complexity_vs_cpu_time.png")
 
 
@@ -132,8 +141,7 @@ fig5, ax5 = plt.subplots(figsize=(10, 6))
 ax5.scatter(df_plot['Complexity'], df_plot['RAM_Peak_Max_MB'], alpha=0.5, s=30, color='#27ae60', label='RAM Peak (points)')
 
 # Average trend
-trend_ram = df_plot.groupby('Complexity')['RAM_Peak_Max_MB'].mean().reset_index()
-ax5.plot(trend_ram['Complexity'], trend_ram['RAM_Peak_Max_MB'], color='#27ae60', linestyle='-', linewidth=2, marker='o', markersize=6, label='Mean Trend')
+ax5.plot(trends['Complexity'], trends['RAM_Peak_Max_MB'], color='#27ae60', linestyle='-', linewidth=2, marker='o', markersize=6, label='Mean Trend')
 
 ax5.set_xlabel('Complexity')
 ax5.set_ylabel('RAM Peak (MB)')
@@ -143,6 +151,7 @@ ax5.grid(True, alpha=0.3)
 plt.tight_layout()
 
 plt.savefig('Results/Method 3/Visualizations/complexity_vs_ram.png', dpi=150)
+plt.close(fig5)
 print("Chart saved to Results/Method 3/Visualizations/complexity_vs_ram.png")
 
 
@@ -155,8 +164,7 @@ fig6, ax6 = plt.subplots(figsize=(10, 6))
 
 ax6.scatter(df_plot['Complexity'], df_plot['SOAP_Calls_Count'], alpha=0.5, s=40, color='#8e44ad', label='Data Points')
 
-trend_soap = df_plot.groupby('Complexity')['SOAP_Calls_Count'].mean().reset_index()
-ax6.plot(trend_soap['Complexity'], trend_soap['SOAP_Calls_Count'], color='#8e44ad', linestyle='-', linewidth=2, marker='o', markersize=6, label='Mean Trend')
+ax6.plot(trends['Complexity'], trends['SOAP_Calls_Count'], color='#8e44ad', linestyle='-', linewidth=2, marker='o', markersize=6, label='Mean Trend')
 
 ax6.set_xlabel('Complexity')
 ax6.set_ylabel('SOAP Calls Count')
@@ -166,6 +174,7 @@ ax6.grid(True, alpha=0.3)
 plt.tight_layout()
 
 plt.savefig('Results/Method 3/Visualizations/complexity_vs_soap_calls.png', dpi=150)
+plt.close(fig6)
 print("Chart saved to Results/Method 3/Visualizations/complexity_vs_soap_calls.png")
 
 
@@ -180,11 +189,8 @@ ax7.scatter(df_plot['Complexity'], df_plot['Request_Size_Bytes'], alpha=0.4, s=2
 ax7.scatter(df_plot['Complexity'], df_plot['Response_Size_Bytes'], alpha=0.4, s=25, color='#e67e22', label='Response (points)')
 
 # Trend lines
-trend_req = df_plot.groupby('Complexity')['Request_Size_Bytes'].mean().reset_index()
-trend_resp = df_plot.groupby('Complexity')['Response_Size_Bytes'].mean().reset_index()
-
-ax7.plot(trend_req['Complexity'], trend_req['Request_Size_Bytes'], color='#3498db', linestyle='-', linewidth=2, marker='o', markersize=6, label='Request Trend')
-ax7.plot(trend_resp['Complexity'], trend_resp['Response_Size_Bytes'], color='#e67e22', linestyle='-', linewidth=2, marker='s', markersize=6, label='Response Trend')
+ax7.plot(trends['Complexity'], trends['Request_Size_Bytes'], color='#3498db', linestyle='-', linewidth=2, marker='o', markersize=6, label='Request Trend')
+ax7.plot(trends['Complexity'], trends['Response_Size_Bytes'], color='#e67e22', linestyle='-', linewidth=2, marker='s', markersize=6, label='Response Trend')
 
 ax7.set_xlabel('Complexity')
 ax7.set_ylabel('Size (Bytes)')
@@ -194,6 +200,7 @@ ax7.grid(True, alpha=0.3)
 plt.tight_layout()
 
 plt.savefig('Results/Method 3/Visualizations/complexity_vs_message_size.png', dpi=150)
+plt.close(fig7)
 print("Chart saved to Results/Method 3/Visualizations/complexity_vs_message_size.png")
 
 print("\nAll visualizations generated successfully!")